@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session as OrmSession
+
+from app.api.errors import error_response
+from app.auth.session import get_user_for_session
+from app.config import settings
+from app.db.database import get_db
+from app.schemas.chats import MessageSearchResponse, MessageSearchResult
+from app.schemas.errors import ErrorResponse
+from app.services import chat_service
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/chats/search",
+    response_model=MessageSearchResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid cursor"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        422: {"model": ErrorResponse, "description": "Validation error (standardized)"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+def search_messages(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = Query(None),
+    db: OrmSession = Depends(get_db),
+):
+    session_id = request.cookies.get(settings.SESSION_COOKIE_NAME)
+    user = get_user_for_session(db=db, session_id=session_id)
+    if not user:
+        return error_response(
+            status_code=401,
+            code="UNAUTHORIZED",
+            message="auth required",
+        )
+    after = None
+    if cursor is not None:
+        after = chat_service.decode_cursor(cursor)
+        if after is None:
+            return error_response(
+                status_code=400,
+                code="CURSOR_INVALID",
+                message="cursor is not valid",
+            )
+    rows, next_cursor, truncated = chat_service.search_messages(
+        db=db,
+        user_id=user.user_id,
+        query=q,
+        limit=limit,
+        after=after,
+    )
+    return MessageSearchResponse(
+        results=[
+            MessageSearchResult(
+                message_id=str(row["message_id"]),
+                thread_id=str(row["thread_id"]),
+                sender_id=str(row["sender_id"]),
+                created_at=row["created_at"],
+                snippet=row["snippet"],
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+        truncated=truncated,
+    )
@@ -1,7 +1,12 @@
 from app.db.database import Base, engine
+from app.db.search_index import create_search_indexes
+from app.models import message as message_model  # noqa: F401
 from app.models import session as session_model  # noqa: F401
+from app.models import thread as thread_model  # noqa: F401
 from app.models import user as user_model  # noqa: F401
 
 
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        create_search_indexes(connection)
@@ -0,0 +1,105 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# External-content FTS5 table over messages; rowid mirrors messages.message_id.
+# thread_id is indexed as a token so searches can be scoped to a user's threads
+# inside the MATCH expression, and is weighted 0 in the rank so it never scores.
+# Triggers keep it in sync with every write to messages, ORM or raw SQL.
+_MESSAGE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        body,
+        thread_id,
+        content='messages',
+        content_rowid='message_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, body, thread_id)
+        VALUES (new.message_id, new.body, new.thread_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, body, thread_id)
+        VALUES ('delete', old.message_id, old.body, old.thread_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF body, thread_id ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, body, thread_id)
+        VALUES ('delete', old.message_id, old.body, old.thread_id);
+        INSERT INTO messages_fts(rowid, body, thread_id)
+        VALUES (new.message_id, new.body, new.thread_id);
+    END
+    """,
+    "INSERT INTO messages_fts(messages_fts, rank) VALUES ('rank', 'bm25(1.0, 0.0)')",
+)
+
+
+# Case-normalized keys for users; queries must repeat these expressions verbatim
+# for SQLite to pick the matching expression index. lower() only folds ASCII.
+USER_NAME_KEY = "lower(trim(coalesce(first_name, '') || ' ' || coalesce(last_name, '')))"
+USER_LAST_NAME_KEY = "lower(last_name)"
+USER_EMAIL_KEY = "lower(email)"
+
+# Prefix lookups use the expression indexes; infix lookups use a trigram FTS5 table
+# over names only, so substrings of email addresses are never searchable.
+_USER_SEARCH_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_users_name_key ON users ({USER_NAME_KEY})",
+    f"CREATE INDEX IF NOT EXISTS ix_users_last_name_key ON users ({USER_LAST_NAME_KEY})",
+    f"CREATE INDEX IF NOT EXISTS ix_users_email_key ON users ({USER_EMAIL_KEY})",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        first_name,
+        last_name,
+        content='users',
+        content_rowid='user_id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, first_name, last_name)
+        VALUES (new.user_id, new.first_name, new.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, first_name, last_name)
+        VALUES ('delete', old.user_id, old.first_name, old.last_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au
+    AFTER UPDATE OF first_name, last_name ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, first_name, last_name)
+        VALUES ('delete', old.user_id, old.first_name, old.last_name);
+        INSERT INTO users_fts(rowid, first_name, last_name)
+        VALUES (new.user_id, new.first_name, new.last_name);
+    END
+    """,
+)
+
+_SEARCH_TABLES = (
+    ("messages_fts", _MESSAGE_SEARCH_DDL),
+    ("users_fts", _USER_SEARCH_DDL),
+)
+
+
+def create_search_indexes(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for table, statements in _SEARCH_TABLES:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table},
+        ).first()
+        for statement in statements:
+            connection.execute(text(statement))
+        if not exists:
+            # Index rows written before the table existed (e.g. users from v0.1.0).
+            connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
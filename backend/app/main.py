@@ -9,7 +9,9 @@ from app.api.errors import (
     validation_exception_handler,
 )
 from app.api.routes import auth as auth_routes
+from app.api.routes import chats as chat_routes
 from app.api.routes import status as status_routes
+from app.api.routes import users as user_routes
 from app.db.init_db import init_db
 
 @asynccontextmanager
@@ -26,6 +28,8 @@ app.add_exception_handler(Exception, unhandled_exception_handler)
 
 app.include_router(auth_routes.router)
 app.include_router(status_routes.router)
+app.include_router(chat_routes.router)
+app.include_router(user_routes.router)
 
 
 @app.get("/health")
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class MessageSearchResult(BaseModel):
+    message_id: str
+    thread_id: str
+    sender_id: str
+    created_at: datetime
+    snippet: str = Field(
+        description=(
+            "HTML-escaped excerpt of the message body; matched terms are wrapped "
+            "in <mark>...</mark>, the only markup the snippet contains."
+        )
+    )
+
+
+class MessageSearchResponse(BaseModel):
+    results: list[MessageSearchResult]
+    next_cursor: str | None
+    truncated: bool = Field(
+        description=(
+            "True when the query matched more messages than the 200 best-ranked ones "
+            "that can be paged through; the rest are only reachable by a narrower query. "
+            "The same value is returned on every page."
+        )
+    )
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, EmailStr, Field
+
+
+class UserSearchResult(BaseModel):
+    user_id: str
+    first_name: str | None
+    last_name: str | None
+    email: EmailStr | None = Field(
+        description="Only present when the query was the full email address."
+    )
+
+
+class UserSearchResponse(BaseModel):
+    results: list[UserSearchResult]
+    next_cursor: str | None
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session as OrmSession
 from app.auth.password import hash_password, validate_password, verify_password
 from app.auth.session import create_session, delete_session
 from app.models.user import User
+from app.services import user_search_service
 
 
 def create_account(
@@ -29,6 +30,7 @@ def create_account(
     db.add(user)
     db.commit()
     db.refresh(user)
+    user_search_service.invalidate_cache()
     return user, None
 
 
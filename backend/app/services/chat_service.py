@@ -0,0 +1,239 @@
+from collections import Counter
+import html
+import math
+import re
+import unicodedata
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.orm import Session as OrmSession
+
+from app.models.thread import ThreadMember
+from app.services import pagination
+
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+_SNIPPET_ELLIPSIS = "…"
+_SNIPPET_TOKENS = 12
+# Runs of letters and digits, as FTS5's unicode61 tokenizer splits them.
+_TERM_PATTERN = re.compile(r"[^\W_]+")
+# Past this many threads the OR list in MATCH costs more than filtering hits in SQL.
+_MAX_SCOPED_THREADS = 100
+# FTS5's bm25 counts every row containing each term across the whole index, so a
+# common word costs the same however few messages the user can see. Scopes up to
+# this size are instead read through messages.thread_id and ranked in Python.
+_MAX_SCANNED_MESSAGES = 2000
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# bm25 depends on index-wide statistics, so any write to messages shifts every score
+# and a (rank, id) keyset would drift between pages. Instead the first page ranks up
+# to _MAX_RESULTS ids once and the cursor carries the ids that are still to come,
+# after a 0/1 flag recording whether more matches were left out.
+_MAX_RESULTS = 200
+
+_RANKED_IDS_SQL = """
+    SELECT m.message_id AS message_id
+    FROM messages_fts
+    JOIN messages AS m ON m.message_id = messages_fts.rowid
+    WHERE messages_fts MATCH :match
+      {scope}
+    ORDER BY messages_fts.rank, m.message_id
+    LIMIT :limit
+"""
+_MEMBER_SCOPE = """
+      AND m.thread_id IN (
+          SELECT thread_id FROM thread_members WHERE user_id = :user_id
+      )
+"""
+_RANKED_IDS_IN_MATCH_SQL = text(_RANKED_IDS_SQL.format(scope=""))
+_RANKED_IDS_BY_MEMBER_SQL = text(_RANKED_IDS_SQL.format(scope=_MEMBER_SCOPE))
+_SCOPE_SQL = """
+    SELECT {columns} FROM messages AS m
+    WHERE 1 = 1 {scope}
+"""
+_SCOPE_SIZE_SQL = text(
+    "SELECT count(*) FROM ("
+    + _SCOPE_SQL.format(columns="1", scope=_MEMBER_SCOPE)
+    + " LIMIT :limit)"
+)
+_SCOPE_BODIES_SQL = text(_SCOPE_SQL.format(columns="m.message_id, m.body", scope=_MEMBER_SCOPE))
+# Page rows are re-read by primary key and re-checked against the user's threads (and,
+# in Python, the query), so ids from a cursor never reveal messages the user cannot see.
+_PAGE_SQL = text(
+    _SCOPE_SQL.format(
+        columns="m.message_id, m.thread_id, m.sender_id, m.created_at, m.body",
+        scope="AND m.message_id IN :message_ids " + _MEMBER_SCOPE,
+    )
+).bindparams(bindparam("message_ids", expanding=True))
+
+
+def _fold(value: str) -> str:
+    # Lowercase and strip diacritics like unicode61 with remove_diacritics 2.
+    if value.isascii():
+        return value.lower()
+    decomposed = unicodedata.normalize("NFD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def _terms(value: str) -> list[str]:
+    return _TERM_PATTERN.findall(_fold(value))
+
+
+def build_match_query(query: str, thread_ids: list[int] | None = None) -> str | None:
+    # Free text is reduced to quoted terms so FTS5 operators in user input are inert.
+    terms = _terms(query)
+    if not terms:
+        return None
+    match = "body : (" + " ".join(f'"{term}"' for term in terms) + ")"
+    if thread_ids is not None:
+        threads = " OR ".join(f'"{thread_id}"' for thread_id in thread_ids)
+        match = f"{match} AND thread_id : ({threads})"
+    return match
+
+
+def decode_cursor(cursor: str) -> tuple[bool, list[int]] | None:
+    values = pagination.decode_cursor(cursor)
+    if values is None or not 2 <= len(values) <= _MAX_RESULTS + 1:
+        return None
+    truncated, *message_ids = values
+    if truncated not in (0, 1) or isinstance(truncated, bool):
+        return None
+    if not all(pagination.is_row_id(value) for value in message_ids):
+        return None
+    return bool(truncated), message_ids
+
+
+def _snippet(body: str, terms: set[str]) -> str | None:
+    # Mirrors FTS5's snippet(): the _SNIPPET_TOKENS-token window holding the most
+    # distinct terms. The body is HTML-escaped, so <mark> is the only markup.
+    # Returns None when the body no longer contains every term.
+    tokens = list(_TERM_PATTERN.finditer(body))
+    hits = [_fold(token.group()) in terms for token in tokens]
+    if {_fold(token.group()) for token, hit in zip(tokens, hits) if hit} != terms:
+        return None
+    best_start, best_score = 0, (-1, -1)
+    for start in range(max(1, len(tokens) - _SNIPPET_TOKENS + 1)):
+        window = range(start, min(start + _SNIPPET_TOKENS, len(tokens)))
+        found = {_fold(tokens[index].group()) for index in window if hits[index]}
+        score = (len(found), sum(hits[index] for index in window))
+        if score > best_score:
+            best_start, best_score = start, score
+    end = min(best_start + _SNIPPET_TOKENS, len(tokens))
+    text_start = tokens[best_start].start() if best_start else 0
+    text_end = tokens[end - 1].end() if end < len(tokens) else len(body)
+    parts = [_SNIPPET_ELLIPSIS] if best_start else []
+    position = text_start
+    for index in range(best_start, end):
+        if hits[index]:
+            token = tokens[index]
+            parts.append(html.escape(body[position:token.start()]))
+            parts.append(f"{HIGHLIGHT_START}{html.escape(token.group())}{HIGHLIGHT_END}")
+            position = token.end()
+    parts.append(html.escape(body[position:text_end]))
+    if end < len(tokens):
+        parts.append(_SNIPPET_ELLIPSIS)
+    return "".join(parts)
+
+
+def _scan_ranked_ids(db: OrmSession, user_id: int, terms: set[str]) -> list[int]:
+    # Same bm25 as FTS5, with document counts and lengths taken from the user's
+    # own messages rather than the whole index.
+    rows = db.execute(_SCOPE_BODIES_SQL, {"user_id": user_id}).all()
+    folded = [_fold(body) for _, body in rows]
+    total_length = len(_TERM_PATTERN.findall("\n".join(folded)))
+    document_counts = Counter()
+    hits = []
+    for (message_id, _), body in zip(rows, folded):
+        # Substring checks are cheap and rule out most messages before tokenizing.
+        if not any(term in body for term in terms):
+            continue
+        tokens = _TERM_PATTERN.findall(body)
+        counts = {term: count for term, count in Counter(tokens).items() if term in terms}
+        document_counts.update(counts.keys())
+        if len(counts) == len(terms):
+            hits.append((message_id, len(tokens), counts))
+    if not hits:
+        return []
+    average_length = total_length / len(rows)
+    idf = {
+        term: max(math.log((len(rows) - count + 0.5) / (count + 0.5)), 1e-6)
+        for term, count in document_counts.items()
+    }
+    scored = []
+    for message_id, length, counts in hits:
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * length / average_length)
+        score = sum(
+            idf[term] * count * (_BM25_K1 + 1) / (count + norm)
+            for term, count in counts.items()
+        )
+        scored.append((-score, message_id))
+    scored.sort()
+    return [message_id for _, message_id in scored[: _MAX_RESULTS + 1]]
+
+
+def _ranked_ids(db: OrmSession, user_id: int, query: str) -> list[int]:
+    scope_size = db.scalar(
+        _SCOPE_SIZE_SQL, {"user_id": user_id, "limit": _MAX_SCANNED_MESSAGES + 1}
+    )
+    if not scope_size:
+        return []
+    if scope_size <= _MAX_SCANNED_MESSAGES:
+        return _scan_ranked_ids(db=db, user_id=user_id, terms=set(_terms(query)))
+    thread_ids = db.scalars(
+        select(ThreadMember.thread_id)
+        .where(ThreadMember.user_id == user_id)
+        .limit(_MAX_SCOPED_THREADS + 1)
+    ).all()
+    if len(thread_ids) > _MAX_SCOPED_THREADS:
+        statement = _RANKED_IDS_BY_MEMBER_SQL
+        match = build_match_query(query)
+    else:
+        statement = _RANKED_IDS_IN_MATCH_SQL
+        match = build_match_query(query, thread_ids)
+    return list(
+        db.scalars(statement, {"match": match, "user_id": user_id, "limit": _MAX_RESULTS + 1})
+    )
+
+
+def search_messages(
+    db: OrmSession,
+    user_id: int,
+    query: str,
+    limit: int,
+    after: tuple[bool, list[int]] | None = None,
+) -> tuple[list[dict], str | None, bool]:
+    terms = set(_terms(query))
+    if not terms:
+        return [], None, False
+    if after:
+        truncated, message_ids = after
+    else:
+        # One id past the cap tells whether matches were left out.
+        message_ids = _ranked_ids(db=db, user_id=user_id, query=query)
+        truncated = len(message_ids) > _MAX_RESULTS
+        message_ids = message_ids[:_MAX_RESULTS]
+    page_ids, remaining = message_ids[:limit], message_ids[limit:]
+    if not page_ids:
+        return [], None, truncated
+    rows = db.execute(
+        _PAGE_SQL,
+        {"user_id": user_id, "message_ids": page_ids},
+    ).mappings().all()
+    # Rows deleted, edited or moved out of reach since ranking are simply skipped.
+    by_id = {}
+    for row in rows:
+        snippet = _snippet(row["body"], terms)
+        if snippet is not None:
+            by_id[row["message_id"]] = {
+                "message_id": row["message_id"],
+                "thread_id": row["thread_id"],
+                "sender_id": row["sender_id"],
+                "created_at": row["created_at"],
+                "snippet": snippet,
+            }
+    results = [by_id[message_id] for message_id in page_ids if message_id in by_id]
+    next_cursor = None
+    if remaining:
+        next_cursor = pagination.encode_cursor([int(truncated), *remaining])
+    return results, next_cursor, truncated
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+# SQLite integers are signed 64-bit; larger values overflow in the driver.
+_MIN_ROW_ID = -(2**63)
+_MAX_ROW_ID = 2**63 - 1
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
+
+def is_row_id(value: Any) -> bool:
+    if not isinstance(value, int) or isinstance(value, bool):
+        return False
+    return _MIN_ROW_ID <= value <= _MAX_ROW_ID
+
+
+def is_text(value: str) -> bool:
+    # JSON allows lone surrogates ("\ud800"), which SQLite cannot store as UTF-8.
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
@@ -0,0 +1,256 @@
+from collections import OrderedDict
+import sys
+import threading
+import time
+import unicodedata
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session as OrmSession
+
+from app.db.search_index import USER_EMAIL_KEY, USER_LAST_NAME_KEY, USER_NAME_KEY
+from app.services import pagination
+
+
+_PREFIX_TIER = 0
+_INFIX_TIER = 1
+# The trigram tokenizer cannot match substrings shorter than three characters.
+_MIN_INFIX_TERM = 3
+# Only first pages of short prefixes are cached; they are both hot and the most
+# expensive to answer because they match the most rows.
+_CACHED_PREFIX_MAX = 4
+_CACHE_SIZE = 512
+_CACHE_TTL_SECONDS = 60.0
+# Email is matched only exactly, or by a prefix of at least this many characters
+# of the part before the @, so the directory cannot be walked by domain.
+_MIN_EMAIL_PREFIX = 5
+# (key, lower bound, upper bound, matched_on); names share one range, email has its own.
+_PREFIX_KEYS = (
+    (USER_NAME_KEY, ":prefix", ":prefix_end", "name"),
+    (USER_LAST_NAME_KEY, ":prefix", ":prefix_end", "name"),
+    (USER_EMAIL_KEY, ":prefix", ":email_end", "email"),
+)
+
+
+def _outside_range(key: str, lower: str, upper: str) -> str:
+    return f"({key} IS NULL OR {key} < {lower} OR {key} >= {upper})"
+
+
+def _prefix_branch(position: int) -> str:
+    # A user is reported under the first key that matches, so every user appears
+    # once and (match_key, user_id) is a total order for the keyset cursor.
+    key, _, upper, matched_on = _PREFIX_KEYS[position]
+    earlier = "".join(
+        f"AND {_outside_range(*other[:3])} " for other in _PREFIX_KEYS[:position]
+    )
+    return f"""
+    SELECT * FROM (
+        SELECT {key} AS match_key, '{matched_on}' AS matched_on,
+            user_id, first_name, last_name, email
+        FROM users
+        WHERE {key} >= :after_key AND {key} < {upper}
+          AND ({key}, user_id) > (:after_key, :after_id)
+          {earlier}
+        ORDER BY {key}, user_id
+        LIMIT :limit
+    )
+    """
+
+
+_PREFIX_SQL = text(
+    " UNION ALL ".join(_prefix_branch(position) for position in range(len(_PREFIX_KEYS)))
+    + " ORDER BY match_key, user_id LIMIT :limit"
+)
+_INFIX_SQL = text(
+    f"""
+    SELECT users.user_id AS user_id, first_name, last_name, email
+    FROM (
+        SELECT rowid AS hit_id FROM users_fts
+        WHERE users_fts MATCH :match AND rowid > :after_id
+    ) AS hits
+    JOIN users ON users.user_id = hits.hit_id
+    WHERE {" AND ".join(_outside_range(*key[:3]) for key in _PREFIX_KEYS)}
+    ORDER BY hits.hit_id
+    LIMIT :limit
+    """
+)
+
+
+class _PageCache:
+    def __init__(self, size: int, ttl_seconds: float) -> None:
+        self._size = size
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self._ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_first_pages = _PageCache(size=_CACHE_SIZE, ttl_seconds=_CACHE_TTL_SECONDS)
+
+
+def invalidate_cache() -> None:
+    _first_pages.clear()
+
+
+def normalize_query(query: str) -> str:
+    # Mirror SQLite's lower(), which only folds ASCII, so keys compare equal. Control
+    # characters never appear in names and a NUL would end the FTS5 query string.
+    collapsed = " ".join(query.split())
+    return "".join(
+        char.lower() if char.isascii() else char
+        for char in collapsed
+        if unicodedata.category(char) != "Cc"
+    )
+
+
+def _prefix_end(prefix: str) -> str | None:
+    # Smallest string above every string starting with prefix. Trailing U+10FFFF
+    # cannot be incremented, so it is dropped; the surrogate block is skipped
+    # because SQLite text must encode as UTF-8.
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    next_code = ord(stripped[-1]) + 1
+    if 0xD800 <= next_code <= 0xDFFF:
+        next_code = 0xE000
+    return stripped[:-1] + chr(next_code)
+
+
+def _email_end(prefix: str) -> str:
+    if "@" in prefix:
+        # Exact address: the only string in [prefix, prefix + "\0") is prefix itself.
+        return prefix + "\0"
+    if len(prefix) >= _MIN_EMAIL_PREFIX and " " not in prefix:
+        return _prefix_end(prefix) or ""
+    # An empty upper bound disables the email branch.
+    return ""
+
+
+def _infix_match(prefix: str) -> str | None:
+    terms = prefix.split(" ")
+    if any(len(term) < _MIN_INFIX_TERM for term in terms):
+        return None
+    quoted = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+    return "{first_name last_name} : (" + quoted + ")"
+
+
+def decode_cursor(cursor: str) -> tuple[int, str, int] | None:
+    values = pagination.decode_cursor(cursor)
+    if values is None or len(values) != 3:
+        return None
+    tier, key, user_id = values
+    if tier not in (_PREFIX_TIER, _INFIX_TIER) or isinstance(tier, bool):
+        return None
+    if not isinstance(key, str) or not pagination.is_text(key):
+        return None
+    if not pagination.is_row_id(user_id):
+        return None
+    return tier, key, user_id
+
+
+def _as_result(row, prefix: str) -> dict:
+    # Email is only shown to someone who typed the whole address; a local-part
+    # prefix finds the user but would otherwise reveal the rest, domain included.
+    exact = row["matched_on"] == "email" and row["match_key"] == prefix
+    return {
+        "user_id": row["user_id"],
+        "first_name": row["first_name"],
+        "last_name": row["last_name"],
+        "email": row["email"] if exact else None,
+    }
+
+
+def _fetch_rows(
+    db: OrmSession,
+    prefix: str,
+    count: int,
+    after: tuple[int, str, int] | None,
+) -> list[dict]:
+    # Rows carry their tier and match_key so any of them can end a page.
+    tier, after_key, after_id = after if after else (_PREFIX_TIER, prefix, 0)
+    params = {
+        "prefix": prefix,
+        "prefix_end": _prefix_end(prefix),
+        "email_end": _email_end(prefix),
+    }
+    rows: list[dict] = []
+    if tier == _PREFIX_TIER:
+        rows = [
+            {**row, "tier": _PREFIX_TIER}
+            for row in db.execute(
+                _PREFIX_SQL,
+                {
+                    **params,
+                    "after_key": max(after_key, prefix),
+                    "after_id": after_id,
+                    "limit": count,
+                },
+            ).mappings()
+        ]
+        if len(rows) == count:
+            return rows
+        after_id = 0
+
+    match = _infix_match(prefix)
+    if match is None:
+        return rows
+    infix_rows = db.execute(
+        _INFIX_SQL,
+        {**params, "match": match, "after_id": after_id, "limit": count - len(rows)},
+    ).mappings()
+    return rows + [
+        {**row, "tier": _INFIX_TIER, "match_key": "", "matched_on": "name"}
+        for row in infix_rows
+    ]
+
+
+def search_users(
+    db: OrmSession,
+    viewer_id: int,
+    query: str,
+    limit: int,
+    after: tuple[int, str, int] | None = None,
+) -> tuple[list[dict], str | None]:
+    prefix = normalize_query(query)
+    if not prefix or _prefix_end(prefix) is None:
+        return [], None
+    # Two spare rows: one may be the viewer, the other tells whether more remain.
+    # Leaving the viewer out here rather than in SQL keeps cached pages shareable.
+    count = limit + 2
+    cache_key = None
+    rows = None
+    if after is None and len(prefix) <= _CACHED_PREFIX_MAX:
+        cache_key = (prefix, limit)
+        rows = _first_pages.get(cache_key)
+    if rows is None:
+        rows = _fetch_rows(db=db, prefix=prefix, count=count, after=after)
+        if cache_key is not None:
+            _first_pages.put(cache_key, rows)
+    rows = [row for row in rows if row["user_id"] != viewer_id]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = pagination.encode_cursor([last["tier"], last["match_key"], last["user_id"]])
+    return [_as_result(row, prefix) for row in rows], next_cursor
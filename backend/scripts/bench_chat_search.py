@@ -0,0 +1,172 @@
+import argparse
+from datetime import datetime, timedelta
+import itertools
+import math
+import os
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+_VOCABULARY = (
+    "in out tonight tomorrow pizza tacos coffee bowling karaoke movie park gym run "
+    "beach dinner lunch brunch drinks game party concert hike bike study library "
+    "office late early now later maybe sure nope yes down free busy plans call text "
+    "meet pick drive walk train bus airport weekend monday friday saturday sunday"
+).split()
+# Chat text is mostly a handful of very common words plus a long tail.
+_TAIL_WORDS = 20_000
+_QUERIES = (
+    "in", "pizza", "karaoke tonight", "bowling", "airport friday", "w1234", "w77 park"
+)
+
+
+def _use_database(database_url: str) -> None:
+    # Settings read the URL at import time, so this must run before any app import.
+    os.environ["IMIN_DATABASE_URL"] = database_url
+    backend_dir = Path(__file__).resolve().parents[1]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+
+def _timed(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[math.ceil(len(samples) * 0.95) - 1]
+
+
+def run(messages: int, users: int, threads: int, repeat: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="imin-bench-")
+    _use_database(f"sqlite:///{Path(workdir) / 'bench.db'}")
+    # pylint: disable=import-error
+    from sqlalchemy import insert, text
+
+    from app.db.database import SessionLocal, engine
+    from app.db.init_db import init_db
+    from app.models.message import Message
+    from app.models.thread import Thread, ThreadMember
+    from app.models.user import User
+    from app.services import chat_service
+
+    init_db()
+
+    rng = random.Random(42)
+    vocabulary = list(_VOCABULARY) + [f"w{index}" for index in range(_TAIL_WORDS)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    now = datetime(2026, 1, 1)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {
+                    "user_id": user_id,
+                    "email": f"user{user_id}@example.com",
+                    "password_hash": "x",
+                    "status": "Out",
+                    "friends_list": [],
+                    "circles": {},
+                }
+                for user_id in range(1, users + 1)
+            ],
+        )
+        connection.execute(
+            insert(Thread),
+            [{"thread_id": thread_id, "updated_at": now} for thread_id in range(1, threads + 1)],
+        )
+        # User 1 is a heavy user who sits in 2% of all threads, user 2 a busy one in
+        # 0.2%; everyone else lands in a handful of threads.
+        members = {}
+        member_rows = []
+        for thread_id in range(1, threads + 1):
+            pair = rng.sample(range(3, users + 1), 2)
+            if thread_id % 50 == 0:
+                pair[0] = 1
+            if thread_id % 500 == 0:
+                pair[1] = 2
+            members[thread_id] = pair
+            member_rows.extend({"thread_id": thread_id, "user_id": user_id} for user_id in pair)
+        connection.execute(insert(ThreadMember), member_rows)
+        batch = []
+        for message_id in range(1, messages + 1):
+            thread_id = rng.randint(1, threads)
+            batch.append(
+                {
+                    "message_id": message_id,
+                    "thread_id": thread_id,
+                    "sender_id": rng.choice(members[thread_id]),
+                    "body": " ".join(
+                        rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(3, 14))
+                    ),
+                    "created_at": now + timedelta(seconds=message_id),
+                }
+            )
+            if len(batch) == 50_000:
+                connection.execute(insert(Message), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(Message), batch)
+    print(f"Loaded {messages:,} messages in {time.perf_counter() - start:.1f}s ({workdir})")
+
+    like_sql = text(
+        """
+        SELECT m.message_id FROM messages AS m
+        WHERE m.body LIKE :pattern
+          AND m.thread_id IN (SELECT thread_id FROM thread_members WHERE user_id = :user_id)
+        ORDER BY m.created_at DESC
+        LIMIT 20
+        """
+    )
+    print(
+        f"{'user':<8}{'query':<18}{'first p50':>11}{'first p95':>11}"
+        f"{'page2 p50':>11}{'like p50':>10}{'like p95':>10}"
+    )
+    with SessionLocal() as db:
+        for label, user_id in (("typical", members[1][1]), ("busy", 2), ("heavy", 1)):
+            for query in _QUERIES:
+                first = _timed(
+                    lambda: chat_service.search_messages(
+                        db=db, user_id=user_id, query=query, limit=20
+                    ),
+                    repeat,
+                )
+                _, cursor, _ = chat_service.search_messages(
+                    db=db, user_id=user_id, query=query, limit=20
+                )
+                after = chat_service.decode_cursor(cursor) if cursor else None
+                second = "-"
+                if after:
+                    page = _timed(
+                        lambda: chat_service.search_messages(
+                            db=db, user_id=user_id, query=query, limit=20, after=after
+                        ),
+                        repeat,
+                    )
+                    second = f"{page[0]:.2f}ms"
+                like = _timed(
+                    lambda: db.execute(
+                        like_sql, {"pattern": f"%{query.split()[0]}%", "user_id": user_id}
+                    ).all(),
+                    max(5, repeat // 4),
+                )
+                print(
+                    f"{label:<8}{query:<18}{first[0]:>9.2f}ms{first[1]:>9.2f}ms"
+                    f"{second:>11}{like[0]:>8.2f}ms{like[1]:>8.2f}ms"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chat message search.")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(messages=args.messages, users=args.users, threads=args.threads, repeat=args.repeat)
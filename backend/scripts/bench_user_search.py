@@ -0,0 +1,117 @@
+import argparse
+import math
+import os
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+_SYLLABLES = (
+    "al ex an na jo mi ke la ri sa to ma ya da vi el li on ra be ca de fi go ha "
+    "ju ka lo mo ni pa qu re si tu va wi xa yo ze"
+).split()
+_DOMAINS = ("example.com", "mail.com", "imin.app", "school.edu")
+# Short prefixes, full names, a last name, an email local-part prefix and
+# infix-only substrings.
+_QUERIES = ("a", "al", "ale", "alex", "alex mari", "lari", "alex.ma", "xamo", "nnak", "ayam")
+
+
+def _use_database(database_url: str) -> None:
+    # Settings read the URL at import time, so this must run before any app import.
+    os.environ["IMIN_DATABASE_URL"] = database_url
+    backend_dir = Path(__file__).resolve().parents[1]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+
+
+def _timed(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[math.ceil(len(samples) * 0.95) - 1]
+
+
+def _name(rng: random.Random, parts: int) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def run(users: int, repeat: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="imin-bench-")
+    _use_database(f"sqlite:///{Path(workdir) / 'bench.db'}")
+    # pylint: disable=import-error
+    from sqlalchemy import insert
+
+    from app.db.database import SessionLocal, engine
+    from app.db.init_db import init_db
+    from app.models.user import User
+    from app.services import user_search_service
+
+    init_db()
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        batch = []
+        for user_id in range(1, users + 1):
+            first_name = _name(rng, rng.randint(1, 3))
+            last_name = _name(rng, rng.randint(2, 4))
+            # Roughly one account in five has not filled in a name yet.
+            named = rng.random() > 0.2
+            batch.append(
+                {
+                    "user_id": user_id,
+                    "first_name": first_name if named else None,
+                    "last_name": last_name if named else None,
+                    "email": f"{first_name}.{last_name}{user_id}@{rng.choice(_DOMAINS)}".lower(),
+                    "password_hash": "x",
+                    "status": "Out",
+                    "friends_list": [],
+                    "circles": {},
+                }
+            )
+            if len(batch) == 50_000:
+                connection.execute(insert(User), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(User), batch)
+        connection.exec_driver_sql("ANALYZE")
+    print(f"Loaded {users:,} users in {time.perf_counter() - start:.1f}s ({workdir})")
+
+    def cold(query: str, after=None):
+        user_search_service.invalidate_cache()
+        return user_search_service.search_users(
+            db=db, viewer_id=0, query=query, limit=20, after=after
+        )
+
+    print(f"{'query':<10}{'cold p50':>10}{'cold p95':>10}{'page2 p50':>11}{'cached p50':>12}")
+    with SessionLocal() as db:
+        for query in _QUERIES:
+            first = _timed(lambda: cold(query), repeat)
+            _, cursor = cold(query)
+            after = user_search_service.decode_cursor(cursor) if cursor else None
+            second = f"{_timed(lambda: cold(query, after), repeat)[0]:.2f}ms" if after else "-"
+            user_search_service.search_users(db=db, viewer_id=0, query=query, limit=20)
+            cached = _timed(
+                lambda: user_search_service.search_users(
+                    db=db, viewer_id=0, query=query, limit=20
+                ),
+                repeat,
+            )
+            print(
+                f"{query:<10}{first[0]:>8.2f}ms{first[1]:>8.2f}ms"
+                f"{second:>11}{cached[0]:>10.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark user directory search.")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(users=args.users, repeat=args.repeat)
@@ -0,0 +1,268 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.db.database import SessionLocal
+from app.db.init_db import init_db
+from app.main import app
+from app.models.message import Message
+from app.models.session import Session
+from app.models.thread import Thread, ThreadMember
+from app.models.user import User
+from app.services import chat_service, pagination
+
+
+client = TestClient(app)
+
+
+def _clear_db() -> None:
+    with SessionLocal() as db:
+        db.query(Message).delete()
+        db.query(ThreadMember).delete()
+        db.query(Thread).delete()
+        db.query(Session).delete()
+        db.query(User).delete()
+        db.commit()
+
+
+def setup_function() -> None:
+    init_db()
+    _clear_db()
+    client.cookies.clear()
+
+
+def _login(email: str) -> int:
+    client.post("/create_account", json={"email": email, "password": "StrongPass1!"})
+    client.post("/login", json={"email": email, "password": "StrongPass1!"})
+    with SessionLocal() as db:
+        return db.query(User).filter(User.email == email).one().user_id
+
+
+def _create_user(email: str) -> int:
+    with SessionLocal() as db:
+        user = User(email=email, password_hash="x", status="Out")
+        db.add(user)
+        db.commit()
+        return user.user_id
+
+
+def _create_thread(member_ids: list[int], bodies: list[str]) -> int:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    with SessionLocal() as db:
+        thread = Thread(updated_at=now)
+        db.add(thread)
+        db.flush()
+        for user_id in member_ids:
+            db.add(ThreadMember(thread_id=thread.thread_id, user_id=user_id))
+        for offset, body in enumerate(bodies):
+            db.add(
+                Message(
+                    thread_id=thread.thread_id,
+                    sender_id=member_ids[0],
+                    body=body,
+                    created_at=now + timedelta(minutes=offset),
+                )
+            )
+        db.commit()
+        return thread.thread_id
+
+
+def test_search_requires_auth() -> None:
+    response = client.get("/chats/search", params={"q": "pizza"})
+    assert response.status_code == 401
+    assert response.json() == {
+        "error": {"code": "UNAUTHORIZED", "message": "auth required"}
+    }
+
+
+def test_search_scoped_to_member_threads() -> None:
+    other = _create_user("other@example.com")
+    stranger = _create_user("stranger@example.com")
+    me = _login("me@example.com")
+    mine = _create_thread([me, other], ["pizza tonight?", "sure"])
+    _create_thread([other, stranger], ["pizza without me"])
+
+    response = client.get("/chats/search", params={"q": "pizza"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["thread_id"] for row in body["results"]] == [str(mine)]
+    assert body["results"][0]["snippet"] == "<mark>pizza</mark> tonight?"
+    assert body["next_cursor"] is None
+    assert body["truncated"] is False
+
+
+def test_search_ranks_and_paginates() -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread(
+        [me, other],
+        [
+            "tacos",
+            "tacos tacos tacos",
+            "maybe tacos later after the movie ends",
+            "tacos tacos",
+        ],
+    )
+
+    first = client.get("/chats/search", params={"q": "tacos", "limit": 2}).json()
+    assert len(first["results"]) == 2
+    assert first["results"][0]["snippet"].count("<mark>") == 3
+    assert first["next_cursor"]
+
+    second = client.get(
+        "/chats/search",
+        params={"q": "tacos", "limit": 2, "cursor": first["next_cursor"]},
+    ).json()
+    assert len(second["results"]) == 2
+    assert second["next_cursor"] is None
+    seen = [row["message_id"] for row in first["results"] + second["results"]]
+    assert len(set(seen)) == 4
+
+
+def test_search_pages_stay_stable_across_writes() -> None:
+    other = _create_user("other@example.com")
+    stranger = _create_user("stranger@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], [f"pizza {'again ' * (index % 7)}{index}" for index in range(40)])
+
+    first = client.get("/chats/search", params={"q": "pizza", "limit": 10}).json()
+    seen = [row["message_id"] for row in first["results"]]
+    _create_thread([other, stranger], ["pizza"] * 30)
+
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            "/chats/search", params={"q": "pizza", "limit": 10, "cursor": cursor}
+        ).json()
+        seen.extend(row["message_id"] for row in page["results"])
+        cursor = page["next_cursor"]
+    assert len(seen) == 40
+    assert len(set(seen)) == 40
+
+
+def test_search_index_follows_updates_and_deletes() -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], ["bowling at eight"])
+    with SessionLocal() as db:
+        message = db.query(Message).one()
+        message.body = "karaoke at eight"
+        db.commit()
+
+    assert client.get("/chats/search", params={"q": "bowling"}).json()["results"] == []
+    assert len(client.get("/chats/search", params={"q": "karaoke"}).json()["results"]) == 1
+
+    with SessionLocal() as db:
+        db.query(Message).delete()
+        db.commit()
+    assert client.get("/chats/search", params={"q": "karaoke"}).json()["results"] == []
+
+
+def test_search_treats_operators_as_text() -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], ["rock AND roll"])
+    response = client.get("/chats/search", params={"q": 'rock" AND (roll'})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+
+
+def test_search_snippet_escapes_message_markup() -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], ['<b>pizza</b> & <mark>fake</mark> "x"'])
+
+    results = client.get("/chats/search", params={"q": "pizza"}).json()["results"]
+    assert results[0]["snippet"] == (
+        "&lt;b&gt;<mark>pizza</mark>&lt;/b&gt; &amp; "
+        "&lt;mark&gt;fake&lt;/mark&gt; &quot;x&quot;"
+    )
+
+
+def test_search_invalid_cursor() -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], ["pizza tonight?"])
+    for cursor in (
+        "nope",
+        pagination.encode_cursor([0, 10**20]),
+        pagination.encode_cursor([0]),
+        pagination.encode_cursor([2, 1]),
+        pagination.encode_cursor([True, 1]),
+    ):
+        response = client.get("/chats/search", params={"q": "pizza", "cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "CURSOR_INVALID"
+
+
+def test_search_cursor_cannot_reach_other_threads() -> None:
+    other = _create_user("other@example.com")
+    stranger = _create_user("stranger@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], ["pizza tonight?"])
+    _create_thread([other, stranger], ["pizza without me"])
+    with SessionLocal() as db:
+        hidden = db.query(Message).filter(Message.body == "pizza without me").one().message_id
+
+    cursor = pagination.encode_cursor([0, hidden])
+    response = client.get("/chats/search", params={"q": "pizza", "cursor": cursor})
+    assert response.status_code == 200
+    assert response.json() == {"results": [], "next_cursor": None, "truncated": False}
+
+
+def test_search_reports_results_past_the_cap(monkeypatch) -> None:
+    monkeypatch.setattr(chat_service, "_MAX_RESULTS", 3)
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread([me, other], [f"pizza number {index}" for index in range(5)])
+
+    first = client.get("/chats/search", params={"q": "pizza", "limit": 2}).json()
+    assert len(first["results"]) == 2
+    assert first["truncated"] is True
+    last = client.get(
+        "/chats/search",
+        params={"q": "pizza", "limit": 2, "cursor": first["next_cursor"]},
+    ).json()
+    assert len(last["results"]) == 1
+    assert last["next_cursor"] is None
+    assert last["truncated"] is True
+
+    monkeypatch.setattr(chat_service, "_MAX_RESULTS", 5)
+    assert client.get("/chats/search", params={"q": "pizza"}).json()["truncated"] is False
+
+
+def test_search_scoped_by_membership_for_busy_users(monkeypatch) -> None:
+    monkeypatch.setattr(chat_service, "_MAX_SCANNED_MESSAGES", 0)
+    monkeypatch.setattr(chat_service, "_MAX_SCOPED_THREADS", 0)
+    other = _create_user("other@example.com")
+    stranger = _create_user("stranger@example.com")
+    me = _login("me@example.com")
+    mine = _create_thread([me, other], ["pizza tonight?"])
+    _create_thread([other, stranger], ["pizza without me"])
+
+    results = client.get("/chats/search", params={"q": "pizza"}).json()["results"]
+    assert [row["thread_id"] for row in results] == [str(mine)]
+
+
+def test_search_scan_ranks_like_fts(monkeypatch) -> None:
+    other = _create_user("other@example.com")
+    me = _login("me@example.com")
+    _create_thread(
+        [me, other],
+        [
+            "Café tonight, then tacos",
+            "tacos tacos after the movie",
+            "cafe? maybe tacos",
+            "long day, no plans at all, maybe a cafe later or tacos",
+            "nothing here",
+        ],
+    )
+
+    def ranked() -> list[str]:
+        response = client.get("/chats/search", params={"q": "CAFE tacos"})
+        return [row["message_id"] for row in response.json()["results"]]
+
+    scanned = ranked()
+    monkeypatch.setattr(chat_service, "_MAX_SCANNED_MESSAGES", 0)
+    assert len(scanned) == 3
+    assert ranked() == scanned
@@ -0,0 +1,201 @@
+from fastapi.testclient import TestClient
+
+from app.db.database import SessionLocal
+from app.db.init_db import init_db
+from app.main import app
+from app.models.session import Session
+from app.models.user import User
+from app.services import pagination, user_search_service
+
+
+client = TestClient(app)
+
+
+def _clear_db() -> None:
+    with SessionLocal() as db:
+        db.query(Session).delete()
+        db.query(User).delete()
+        db.commit()
+
+
+def setup_function() -> None:
+    init_db()
+    _clear_db()
+    user_search_service.invalidate_cache()
+    client.cookies.clear()
+
+
+def _login() -> None:
+    client.post(
+        "/create_account",
+        json={"email": "searcher@example.com", "password": "StrongPass1!"},
+    )
+    client.post(
+        "/login",
+        json={"email": "searcher@example.com", "password": "StrongPass1!"},
+    )
+
+
+def _create_user(email: str, first_name: str | None, last_name: str | None) -> int:
+    with SessionLocal() as db:
+        user = User(
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            password_hash="x",
+            status="Out",
+        )
+        db.add(user)
+        db.commit()
+        return user.user_id
+
+
+def _names(response) -> list[str]:
+    return [row["last_name"] for row in response.json()["results"]]
+
+
+def _emails(response) -> list[str | None]:
+    return [row["email"] for row in response.json()["results"]]
+
+
+def test_search_requires_auth() -> None:
+    response = client.get("/users/search", params={"q": "ava"})
+    assert response.status_code == 401
+    assert response.json() == {
+        "error": {"code": "UNAUTHORIZED", "message": "auth required"}
+    }
+
+
+def test_search_matches_name_prefixes_case_insensitively() -> None:
+    _create_user("ava@example.com", "Ava", "Stone")
+    _create_user("jo@example.com", "Jordan", "Avalos")
+    _create_user("avery@example.com", None, None)
+    _create_user("maya@example.com", "Maya", "Lee")
+    _login()
+
+    response = client.get("/users/search", params={"q": "AV"})
+    assert response.status_code == 200
+    assert _names(response) == ["Stone", "Avalos"]
+    assert _emails(response) == [None, None]
+    assert _names(client.get("/users/search", params={"q": "ava st"})) == ["Stone"]
+
+
+def test_search_matches_email_only_exactly_or_by_long_local_prefix() -> None:
+    _create_user("AVERY.K@example.com", None, None)
+    _login()
+
+    for query in ("ave", "avery.k@", "example", "@ex", "com"):
+        assert _emails(client.get("/users/search", params={"q": query})) == []
+    response = client.get("/users/search", params={"q": "Avery.K@Example.com"})
+    assert _emails(response) == ["AVERY.K@example.com"]
+
+
+def test_search_hides_email_for_local_prefix_matches() -> None:
+    user_id = _create_user("AVERY.K@example.com", None, None)
+    _login()
+
+    for query in ("avery", "avery.k"):
+        response = client.get("/users/search", params={"q": query})
+        assert [row["user_id"] for row in response.json()["results"]] == [str(user_id)]
+        assert _emails(response) == [None]
+
+
+def test_search_does_not_match_email_substrings() -> None:
+    for index in range(3):
+        _create_user(f"user{index}@example.com", "Kim", f"Park{index}")
+    _login()
+
+    for query in ("com", "@ex", "example.com", "ser1"):
+        assert client.get("/users/search", params={"q": query}).json()["results"] == []
+
+
+def test_search_excludes_the_searcher() -> None:
+    _login()
+    for query in ("sea", "searcher", "searcher@example.com"):
+        assert client.get("/users/search", params={"q": query}).json()["results"] == []
+
+
+def test_search_handles_highest_code_points() -> None:
+    _create_user("ab@example.com", "Ab\U0010ffffy", "Stone")
+    _create_user("cd@example.com", "\ud7ffz", "Lee")
+    _login()
+
+    assert _names(client.get("/users/search", params={"q": "ab\U0010ffff"})) == ["Stone"]
+    assert _names(client.get("/users/search", params={"q": "\ud7ff"})) == ["Lee"]
+    response = client.get("/users/search", params={"q": "\U0010ffff"})
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+def test_search_ignores_control_characters() -> None:
+    _create_user("x1@example.com", "Anna", "Jones")
+    _login()
+
+    for query in ("an\x00na", "anna\x00", "\x1bann\x7fa"):
+        response = client.get("/users/search", params={"q": query})
+        assert response.status_code == 200
+        assert _names(response) == ["Jones"]
+    response = client.get("/users/search", params={"q": "\x00"})
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+def test_search_lists_prefix_matches_before_infix_matches() -> None:
+    _create_user("x1@example.com", "Joanna", "Smith")
+    _create_user("x2@example.com", "Anna", "Jones")
+    _create_user("x3@example.com", "Hannah", "Anning")
+    _login()
+
+    response = client.get("/users/search", params={"q": "ann"})
+    assert _names(response) == ["Jones", "Anning", "Smith"]
+
+
+def test_search_paginates_across_prefix_and_infix_matches() -> None:
+    for index in range(3):
+        _create_user(f"sam{index}@example.com", "Sam", f"Lee{index}")
+    for index in range(3):
+        _create_user(f"u{index}@example.com", "Wisam", f"Khan{index}")
+    _login()
+    with SessionLocal() as db:
+        searcher = db.query(User).filter(User.email == "searcher@example.com").one()
+        searcher.first_name = "Sam"
+        searcher.last_name = "Lee1"
+        db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "sam", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/users/search", params=params).json()
+        assert len(body["results"]) == 2 or not body["next_cursor"]
+        seen.extend(row["last_name"] for row in body["results"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == ["Lee0", "Lee1", "Lee2", "Khan0", "Khan1", "Khan2"]
+
+
+def test_search_cache_is_invalidated_by_new_accounts(monkeypatch) -> None:
+    monkeypatch.setattr(user_search_service, "_CACHED_PREFIX_MAX", 10)
+    _login()
+    assert _emails(client.get("/users/search", params={"q": "newbie"})) == []
+    client.post(
+        "/create_account",
+        json={"email": "newbie@example.com", "password": "StrongPass1!"},
+    )
+    assert _emails(client.get("/users/search", params={"q": "newbie"})) == [None]
+
+
+def test_search_invalid_cursor() -> None:
+    _login()
+    for cursor in (
+        "nope",
+        pagination.encode_cursor([0, "abc", 10**20]),
+        pagination.encode_cursor([0, "\ud800", 1]),
+        pagination.encode_cursor([True, "abc", 1]),
+    ):
+        response = client.get("/users/search", params={"q": "ava", "cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "CURSOR_INVALID"